@@ -1,11 +1,12 @@
 import random
+import sys
 import time
 
 
 def generate_stream(letters, num_stimuli, letter_offset=10, letter_distances=(1,2,3,4,5)):
-    stream = [random.randint(0,9) for _ in range(num_stimuli)]
+    stream = random.choices(range(10), k=num_stimuli)
     pos = letter_offset + random.randint(0, len(stream)-max(letter_distances)-letter_offset-1)
-    letters = [random.choice(letters) for _ in range(2)]
+    letters = random.choices(letters, k=2)
     stream[pos] = letters[0]
     stream[pos + random.choice(letter_distances)] = letters[1]
     return stream
@@ -22,9 +23,12 @@ def attentional_blink_experiment():
     print("Attentional Blink Experiment")
     print("Detect the letters in the stream.")
 
+    start_time = time.perf_counter()
     for i, stimulus in enumerate(stream):
-        print(f'{stimulus}{stimulus}{stimulus}{stimulus}', end="\r", flush=True)
-        time.sleep(stimulus_duration)
+        sys.stdout.write(f'{stimulus}{stimulus}{stimulus}{stimulus}\r')
+        sys.stdout.flush()
+        # Sleep until a fixed deadline so that printing time does not accumulate as drift
+        time.sleep(max(0, start_time + (i + 1) * stimulus_duration - time.perf_counter()))
 
     print(f"\n{stream}")
 
@@ -1,42 +1,40 @@
 from collections import defaultdict
+import csv
 from io import StringIO
 import re
 
-import pandas as pd
 import wx
 import wx.html2
 
 # Functions
 
 group_header = "Grupa"
+date_re = re.compile(r"\d{4}-\d{2}-\d{2}")
 
 
 def read_table(input: str):
-    converters = {
-        group_header: str,
-        "ID": str,
-        "JMBAG": str,
-        "Prezime": str,
-        "Ime": str,
-    }
-    df = pd.read_csv(
-        StringIO(input),
-        sep="\t",
-        header=None,
-        names=converters.keys(),
-        converters=converters,
-        index_col=False,
-    )
+    import pandas as pd  # imported lazily so that the window appears sooner
+
+    columns = [group_header, "ID", "JMBAG", "Prezime", "Ime"]
+    # Rows without any non-whitespace content (e.g. tab-only lines) are skipped on purpose,
+    # short rows are padded and long ones truncated
+    rows = [
+        (row + [""] * len(columns))[: len(columns)]
+        for row in csv.reader(StringIO(input), delimiter="\t")
+        if "".join(row).strip()
+    ]
+    df = pd.DataFrame(rows, columns=columns, dtype=str)
     return df
 
 
 def split_groups(df):
     room_to_groups = defaultdict(lambda: [])
-    for group, d in df.groupby(group_header):
+    groups = df[group_header].to_numpy()
+    for group, d in df.drop(columns=[group_header]).groupby(groups):
         room = group.split(" ")[-1]
-        if match := re.search(r"\d{4}-\d{2}-\d{2}", group):
+        if match := date_re.search(group):
             room = f"{match.group(0)} {room}"
-        room_to_groups[room].append((group, d.drop(columns=[group_header])))
+        room_to_groups[room].append((group, d))
     return room_to_groups
 
 
@@ -47,7 +45,9 @@ def process_input(input: str, num_pages_per_sheet=1):
     df.set_index("ID", inplace=True)
     df = df.rename_axis(None)
     room_to_groups = split_groups(df)
-    output_parts = [
+    page_break = '\n<div class="page-break"></div>'
+    output = StringIO()
+    output.write(
         """
         <html>
         <style>
@@ -57,32 +57,28 @@ def process_input(input: str, num_pages_per_sheet=1):
             border: 0.05rem solid #000;
             border-collapse: collapse;
             padding: 0.25rem;
+            text-align: left;
         }
+        td:last-child { width: 24em; }  /* Komentar */
         </style>
         <body>"""
-    ]
+    )
+    # Page breaks are written before the next room so that none trail the last one
+    pending_page_breaks = 0
     for room, groups in room_to_groups.items():
-        output_parts.append(f"\n\n<h2> {room} </h2>")
-        for group, df in groups:
-            dfs = df.style.set_properties(**{"text-align": "left"})
-            dfs = dfs.set_table_styles(
-                [dict(selector="th", props=[("text-align", "left")])]
-            )
-            dfs.set_properties(subset=["Komentar"], **{"width": "24em"})
-            output_parts.append(
-                f"\n\n<h3> {group} </h3>"
-                + dfs.to_html()
-                + '<div class="page-break"></div>'
-            )
+        output.write(page_break * pending_page_breaks)
+        output.write(f"\n\n<h2> {room} </h2>")
+        for i, (group, df) in enumerate(groups):
+            if i > 0:
+                output.write(page_break)
+            output.write(f"\n\n<h3> {group} </h3>\n")
+            output.write(df.to_html(border=0, justify="left"))
         num_filler_pages = (
             num_pages_per_sheet - len(groups) % num_pages_per_sheet
         ) % num_pages_per_sheet
-        for _ in range(num_filler_pages):
-            output_parts.append('<div class="page-break"></div>')
-    for _ in range(num_filler_pages + 1):
-        output_parts.pop()
-    output_parts.append("\n</body>\n</html>")
-    return "\n".join(output_parts)
+        pending_page_breaks = num_filler_pages + 1
+    output.write("\n</body>\n</html>")
+    return output.getvalue()
 
 
 # GUI
@@ -3,38 +3,60 @@
 
 import sys
 import re
+import functools
+import gzip
+import json
+import urllib.request
 
 def download_file(URL=None):
-    import httplib2
-    h = httplib2.Http(".cache")
-    resp, content = h.request(URL, "GET")
+    request = urllib.request.Request(URL, headers={"Accept-Encoding": "gzip"})
+    with urllib.request.urlopen(request) as response:
+        content = response.read()
+        if response.headers.get("Content-Encoding") == "gzip":
+            content = gzip.decompress(content)
     return content
 
+# The page is processed as bytes and only the final cells are decoded
+_CELL_BOUNDARY_RE = re.compile(rb"<h\d|<div")
+_REPLACEMENTS = { rb'\(' : b'$', rb'\)' : b'$',
+    b'<pre><code class="python">' : b"``` python\n", b'</code></pre>' : b"```",
+    b'<code>' : b'`', b'</code>' : b'`'}
+# One unit of an HTML tag's contents: a character or a quoted value, which may contain '>'.
+# Neither may contain the start of another tag, so a match cannot run past its own tag
+_TAG_UNIT = rb'(?:[^>"<]|"(?:[^"<]|<(?![a-zA-Z/!]))*")'
+# Image tags and the literal replacements are rewritten in a single scan
+_REFINE_RE = re.compile(
+    rb'(?P<img>(?P<img_start><img ' + _TAG_UNIT + rb'*?src=")(?P<src>[^"<]*)(?P<quote>" ?)'
+    rb'(?P<img_end>' + _TAG_UNIT + rb'*>))|'
+    + b'|'.join(map(re.escape, sorted(_REPLACEMENTS, key=len, reverse=True))))
+# An existing alt attribute after src is dropped from the rewritten tag, together with what precedes it
+_ALT_PREFIX_RE = re.compile(rb'.*?alt="[^"]*"', re.DOTALL)
+
 def extract_cells(html):
-    r = re.compile(r"((?:<h\d|<div).*?)(?=<h\d|<div)", re.DOTALL)
-    return r.findall(html)
+    # Cells span from one boundary to the next; the text after the last boundary is dropped
+    starts = [m.start() for m in _CELL_BOUNDARY_RE.finditer(html)]
+    return [html[a:b] for a, b in zip(starts, starts[1:])]
+
+@functools.lru_cache(maxsize=32)
+def _refine_replacer(base_url):
+    base_url = base_url.encode("utf-8")
+    def replace(m):
+        if m["img"] is None:
+            return _REPLACEMENTS[m[0]]
+        img_end = m["img_end"]
+        if b'alt="' in img_end and (alt := _ALT_PREFIX_RE.match(img_end)):
+            img_end = img_end[alt.end():]
+        return (m["img"] + b"\n" + m["img_start"] + base_url + b"/" + m["src"] + m["quote"]
+                + b' alt="' + m["src"] + b'" ' + img_end)
+    return replace
 
 def refine_cell(html, base_url):
-    replacements = { r'\(' : '$', r'\)' : '$', 
-        '<pre><code class="python">' : "``` python\n", '</code></pre>' : "```",
-        '<code>' : '`', '</code>' : '`'}
-    substrs = sorted(replacements, key=len, reverse=True)
-    regexp = re.compile('|'.join(map(re.escape, substrs)))
-    html = regexp.sub(lambda match: replacements[match.group(0)], html)
-    imgregexp = re.compile(r'((<img .*?src=")(.*?)(" ?)(?:.*?alt=".*?")?(.*?>))', re.DOTALL)        
-    html = imgregexp.sub(r'\1\n\2'+base_url+r'/\3\4 alt="\3" \5', html)
-    return html
+    return _REFINE_RE.sub(_refine_replacer(base_url), html)
 
 def create_ipynb(cells):
-    import json
-    all = ["{ \"cells\" : [\n"]
-    for c in cells:
-        all.append('{ "cell_type": "markdown", "metadata": {}, "source": [ ')
-        all.append(json.dumps(c))
-        all.append(" ] }")
-        all.append(",\n")
-    all[-1] = "\n],"
-    all.append("""      
+    sources = [c.decode("UTF-8", errors="ignore") for c in cells]
+    notebook = {
+        "cells": [{"cell_type": "markdown", "metadata": {}, "source": [s]} for s in sources],
         "metadata": {
             "kernelspec": {
                 "display_name": "Python 3", "language": "python", "name": "python3"
@@ -47,13 +69,12 @@ def create_ipynb(cells):
             }
         },
         "nbformat": 4, "nbformat_minor": 2
-        }""")    
-    return "".join(all)
+    }
+    return json.dumps(notebook, indent=1).encode("utf-8")
 
 def save_notebook(file_path, notebook_content):
-    f = open(file_path, "wb")
-    f.write(notebook_content.encode("utf-8", errors="ignore"))
-    f.close()
+    with open(file_path, "wb") as f:
+        f.write(notebook_content)
 
 def main():
     if len(sys.argv) < 2:
@@ -69,10 +90,11 @@ def main():
             out += ".ipynb"
 
     html = download_file(url)
-    html = html.decode("UTF-8", errors="ignore")
-    raw_cells = extract_cells(html)
-    refined_cells = [refine_cell(c, base_url) for c in raw_cells]
-    ipynb = create_ipynb(refined_cells)
+    # Matches never extend past a single tag or literal, so refining the whole page at once gives
+    # the same cells as splitting first and refining each cell
+    html = refine_cell(html, base_url)
+    cells = extract_cells(html)
+    ipynb = create_ipynb(cells)
     save_notebook(out, ipynb)
 
     print('"'+url+'" converted to "'+out+'"')